@@ -1,4 +1,28 @@
-from .data.openego import OpenEgoDataProvider
-from .data.annotations import Action
+from importlib import import_module
 
-__all__ = ['OpenEgoDataProvider', 'Action']
\ No newline at end of file
+# Submodules are imported on first attribute access so that `import openego` stays
+# cheap and the annotation path never pulls in cv2 or h5py.
+_LAZY_ATTRIBUTES = {
+    'OpenEgoDataProvider': '.data.openego',
+    'Action': '.data.annotations',
+    'ActionIntervalIndex': '.data.annotations',
+    'ActionLabelTrack': '.data.annotations',
+    'RaggedBatch': '.data.collate',
+    'collate_items': '.data.collate',
+    'collate_actions': '.data.collate',
+    'LengthBucketBatchSampler': '.data.collate',
+    'DecoderPool': '.data.decoder',
+}
+_LAZY_SUBMODULES = ['core', 'data']
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    if name in _LAZY_SUBMODULES:
+        return import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__ + _LAZY_SUBMODULES)
\ No newline at end of file
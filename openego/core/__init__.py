@@ -1,9 +1,22 @@
-from .constants import MANO_JOINT_NAMES, EGODEX_JOINT_NAMES
-from .utils import get_sorted_paths, get_video_info, get_video_frames, load_json, get_hdf5_data
-from .projection import convert_points_to_trajetory_coordinates
-
-__all__ = [
-    'MANO_JOINT_NAMES', 'EGODEX_JOINT_NAMES',
-    'get_sorted_paths', 'get_video_info', 'get_video_frames', 
-    'load_json', 'get_hdf5_data', 'convert_points_to_trajetory_coordinates'
-]
\ No newline at end of file
+from importlib import import_module
+
+_LAZY_ATTRIBUTES = {
+    'MANO_JOINT_NAMES': '.constants',
+    'EGODEX_JOINT_NAMES': '.constants',
+    'get_sorted_paths': '.utils',
+    'get_video_info': '.utils',
+    'get_video_frames': '.utils',
+    'load_json': '.utils',
+    'get_hdf5_data': '.utils',
+    'convert_points_to_trajetory_coordinates': '.projection',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
@@ -1,9 +1,7 @@
 from typing import Union, Mapping, Any, Optional, List
 from pathlib import Path
 import numpy as np
-import h5py
 import json
-import cv2
 
 def load_json(file_path: Union[str, Path]) -> Any:
     with open(file_path, "r") as f:
@@ -11,6 +9,7 @@ def load_json(file_path: Union[str, Path]) -> Any:
 
 def get_video_frames(video_path: Path, frame_slice: Optional[slice] = None) -> np.ndarray:
     """Load video frames using OpenCV."""
+    import cv2
     video_capture = cv2.VideoCapture(str(video_path))
     num_frames = int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
     frame_indices = range(num_frames) if frame_slice is None else range(*frame_slice.indices(num_frames))
@@ -27,6 +26,7 @@ def get_video_frames(video_path: Path, frame_slice: Optional[slice] = None) -> n
 
 def get_video_info(video_path: Union[str, Path]) -> dict:
     """Get video metadata."""
+    import cv2
     cap = cv2.VideoCapture(str(video_path))
     if not cap.isOpened():
         raise ValueError(f"Cannot open video file: {video_path}")
@@ -49,6 +49,7 @@ def get_sorted_paths(dir_path: Path, pattern: str) -> List[Path]:
 
 def get_hdf5_data(file_path: Path, key: Optional[str] = None) -> Any:
     """Load data from HDF5 file."""
+    import h5py
     with h5py.File(file_path, "r") as f:
         if key is not None:
             return f[key][()]
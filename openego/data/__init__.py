@@ -1,4 +1,23 @@
-from .openego import OpenEgoDataProvider
-from .annotations import Action
+from importlib import import_module
 
-__all__ = ['OpenEgoDataProvider', 'Action']
\ No newline at end of file
+_LAZY_ATTRIBUTES = {
+    'OpenEgoDataProvider': '.openego',
+    'Action': '.annotations',
+    'ActionIntervalIndex': '.annotations',
+    'ActionLabelTrack': '.annotations',
+    'RaggedBatch': '.collate',
+    'collate_items': '.collate',
+    'collate_actions': '.collate',
+    'LengthBucketBatchSampler': '.collate',
+    'DecoderPool': '.decoder',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from ast import Tuple
 from ..core.projection import convert_points_to_trajetory_coordinates
 from ..core.utils import get_video_frames
-from typing import List, Optional, Mapping, Any, Tuple
+from typing import List, Optional, Mapping, Any, Tuple, Sequence, Union
 from dataclasses import dataclass
 from pathlib import Path
 import numpy as np
@@ -123,4 +123,93 @@ class Action:
                 else:
                     print(f"Video saved to: {tmpfile.name}")
             except ImportError:
-                print(f"Video saved to: {tmpfile.name}")
\ No newline at end of file
+                print(f"Video saved to: {tmpfile.name}")
+
+
+class ActionIntervalIndex:
+    """Frame interval index over the actions of a single demo.
+
+    The timeline is split into elementary segments at every action start and end
+    frame, and the actions covering each segment are computed once. Lookups for
+    arbitrary frame arrays are then a single `np.searchsorted` over the segment
+    boundaries. Action `i` covers frames `[start_frames[i], end_frames[i])`,
+    matching `Action.start_frame` and `Action.end_frame`.
+    """
+    def __init__(self, start_frames: Sequence[int], end_frames: Sequence[int]):
+        self.start_frames = np.asarray(start_frames, dtype=np.int64)
+        self.end_frames = np.asarray(end_frames, dtype=np.int64)
+        assert self.start_frames.shape == self.end_frames.shape, "start_frames and end_frames must have the same length."
+
+        # Segment k spans [boundaries[k], boundaries[k + 1])
+        self.boundaries = np.unique(np.concatenate([self.start_frames, self.end_frames]))
+        coverage = (self.start_frames[np.newaxis, :] <= self.boundaries[:, np.newaxis]) & \
+                   (self.end_frames[np.newaxis, :] > self.boundaries[:, np.newaxis])
+        # Among overlapping actions the one that started last is the active label
+        labels = np.full(len(self.boundaries), -1, dtype=np.int64)
+        if len(self) > 0:
+            latest = np.argmax(np.where(coverage, self.start_frames[np.newaxis, :], np.iinfo(np.int64).min), axis=1)
+            labels = np.where(coverage.any(axis=1), latest, -1)
+
+        # Row 0 is a sentinel for frames before the first boundary
+        self._coverage = np.concatenate([np.zeros((1, len(self)), dtype=bool), coverage])
+        self._labels = np.concatenate([[-1], labels]).astype(np.int32)
+
+    @classmethod
+    def from_annotation(cls, annotation: Mapping[str, Any], fps: float) -> "ActionIntervalIndex":
+        actions = annotation.get("actions", [])
+        start_timestamps = np.array([action["start_timestamp"] for action in actions], dtype=np.float64)
+        end_timestamps = np.array([action["end_timestamp"] for action in actions], dtype=np.float64)
+        # np.rint rounds half to even like the built-in round used by Action
+        return cls(np.rint(start_timestamps * fps), np.rint(end_timestamps * fps))
+
+    def __len__(self) -> int:
+        return len(self.start_frames)
+
+    def _segments(self, frames: Union[int, np.ndarray]) -> np.ndarray:
+        return np.searchsorted(self.boundaries, np.asarray(frames), side="right")
+
+    def labels(self, frames: Union[int, np.ndarray]) -> np.ndarray:
+        """Index of the active action at each frame, -1 where no action is active."""
+        return self._labels[self._segments(frames)]
+
+    def covering(self, frames: Union[int, np.ndarray]) -> np.ndarray:
+        """Boolean mask of shape [..., num_actions] of the actions covering each frame."""
+        return self._coverage[self._segments(frames)]
+
+    def label_track(self, num_frames: int) -> np.ndarray:
+        """Dense per-frame action labels for frames [0, num_frames)."""
+        return self.labels(np.arange(num_frames))
+
+
+class ActionLabelTrack:
+    """Dense per-frame action labels for a whole dataset.
+
+    `labels` holds the local action index (into `annotation['actions']`) of every
+    frame of every demo, concatenated in provider order, -1 where no action is
+    active. Demo `i` occupies `labels[frame_offsets[i]:frame_offsets[i + 1]]`.
+    """
+    LABELS_FILE = "action_labels.npy"
+    OFFSETS_FILE = "frame_offsets.npy"
+
+    def __init__(self, labels: np.ndarray, frame_offsets: np.ndarray):
+        self.labels = labels
+        self.frame_offsets = frame_offsets
+
+    def __len__(self) -> int:
+        return len(self.frame_offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Demo index out of range: {index}")
+        index = index % len(self)
+        return self.labels[self.frame_offsets[index]:self.frame_offsets[index + 1]]
+
+    def save(self, output_dir: Path):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        np.save(output_dir/self.LABELS_FILE, self.labels)
+        np.save(output_dir/self.OFFSETS_FILE, self.frame_offsets)
+
+    @classmethod
+    def load(cls, output_dir: Path, mmap_mode: Optional[str] = "r") -> "ActionLabelTrack":
+        return cls(np.load(output_dir/cls.LABELS_FILE, mmap_mode=mmap_mode),
+                   np.load(output_dir/cls.OFFSETS_FILE))
@@ -0,0 +1,183 @@
+from .annotations import Action
+from typing import List, Mapping, Optional, Any, Sequence, Iterator, TYPE_CHECKING
+from dataclasses import dataclass, field
+import numpy as np
+
+if TYPE_CHECKING:
+    from .decoder import DecoderPool
+
+# Per-frame keys concatenated along the first axis when collating joints
+RAGGED_JOINT_KEYS = ["left_hand", "right_hand", "left_hand_visibility", "right_hand_visibility"]
+
+
+@dataclass
+class RaggedBatch:
+    """Variable-length samples stored as flat buffers.
+
+    Every array in `data` is the concatenation of the per-sample arrays along the
+    first axis, sample `i` occupying rows `offsets[i]:offsets[i] + lengths[i]`.
+    Arrays in `static` hold one entry per sample (e.g. intrinsics).
+    """
+    data: Mapping[str, np.ndarray]
+    offsets: np.ndarray
+    lengths: np.ndarray
+    static: Mapping[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, index: int) -> Mapping[str, np.ndarray]:
+        start, stop = self.offsets[index], self.offsets[index] + self.lengths[index]
+        sample = {key: value[start:stop] for key, value in self.data.items()}
+        sample.update({key: value[index] for key, value in self.static.items()})
+        return sample
+
+    @property
+    def num_frames(self) -> int:
+        return int(self.lengths.sum())
+
+    @property
+    def segment_ids(self) -> np.ndarray:
+        """Sample index of every row in the flat buffers."""
+        return np.repeat(np.arange(len(self.lengths)), self.lengths)
+
+
+def collate_ragged(samples: Sequence[Mapping[str, np.ndarray]], static_keys: Sequence[str] = ()) -> RaggedBatch:
+    """Concatenate per-frame arrays of `samples` into a RaggedBatch without padding."""
+    if len(samples) == 0:
+        raise ValueError("Cannot collate an empty list of samples.")
+
+    keys = set(samples[0].keys())
+    for i, sample in enumerate(samples):
+        if set(sample.keys()) != keys:
+            raise ValueError(f"Sample {i} has keys {sorted(sample.keys())}, expected {sorted(keys)}")
+    ragged_keys = [key for key in samples[0].keys() if key not in static_keys]
+    if not ragged_keys:
+        raise ValueError("Samples have no per-frame arrays to collate, load 'joint' or 'rgb' data.")
+    lengths = np.array([len(sample[ragged_keys[0]]) for sample in samples], dtype=np.int64)
+    for key in ragged_keys:
+        key_lengths = [len(sample[key]) for sample in samples]
+        if not np.array_equal(key_lengths, lengths):
+            raise ValueError(f"Length mismatch for '{key}': {key_lengths} != {lengths.tolist()}")
+
+    offsets = np.zeros_like(lengths)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    data = {key: np.concatenate([sample[key] for sample in samples], axis=0) for key in ragged_keys}
+    static = {key: np.stack([sample[key] for sample in samples]) for key in static_keys}
+    return RaggedBatch(data=data, offsets=offsets, lengths=lengths, static=static)
+
+
+def collate_items(items: Sequence[Mapping[str, Any]]) -> RaggedBatch:
+    """Collate OpenEgoDataProvider items, flattening joints, visibility and rgb frames."""
+    samples = []
+    static_keys = []
+    for item in items:
+        sample = {}
+        if "joint" in item:
+            joints = item["joint"]
+            num_joints = joints["left_hand"].shape[1]
+            for key in RAGGED_JOINT_KEYS:
+                sample[key] = _expand_visibility(joints[key], num_joints) if key.endswith("_visibility") else joints[key]
+            if joints.get("intrinsics") is not None:
+                sample["intrinsic"] = joints["intrinsics"]
+        if "rgb" in item:
+            sample["frames"] = item["rgb"]
+        samples.append(sample)
+
+    if "intrinsic" in samples[0]:
+        static_keys.append("intrinsic")
+    return collate_ragged(samples, static_keys=static_keys)
+
+
+def collate_actions(actions: Sequence[Action], include_frames: bool = False, decoder: Optional["DecoderPool"] = None) -> RaggedBatch:
+    """Collate Action clips, flattening joints, visibility and optionally video frames.
+
+    If a `decoder` is given, frames of all clips are decoded concurrently straight
+    into the batch buffer instead of one `Action.frames` call at a time. The
+    decoder needs all clips to share a resolution, so batches mixing benchmarks
+    with different resolutions raise a ValueError; sample such batches per
+    benchmark.
+    """
+    samples = []
+    for action in actions:
+        sample = {
+            "left_hand": action.left_hand_joints,
+            "right_hand": action.right_hand_joints,
+            "left_hand_visibility": action.left_hand_visibility,
+            "right_hand_visibility": action.right_hand_visibility,
+        }
+        if action.intrinsic is not None:
+            sample["intrinsic"] = action.intrinsic
+        if include_frames and decoder is None:
+            sample["frames"] = action.frames
+        samples.append(sample)
+
+    static_keys = ["intrinsic"] if "intrinsic" in samples[0] else []
+    batch = collate_ragged(samples, static_keys=static_keys)
+    if include_frames and decoder is not None:
+        if any(action.video_path is None for action in actions):
+            raise ValueError("video_path is not set for every Action, cannot decode frames.")
+        frames = decoder.decode_many([(action.video_path, slice(action.start_frame, action.end_frame)) for action in actions])
+        if not (np.array_equal(frames.lengths, batch.lengths) and np.array_equal(frames.offsets, batch.offsets)):
+            raise ValueError(f"Decoded frame counts {frames.lengths.tolist()} do not match action lengths {batch.lengths.tolist()}")
+        batch.data["frames"] = frames.data["frames"]
+    return batch
+
+
+class LengthBucketBatchSampler:
+    """Yield batches of indices whose samples have similar lengths.
+
+    Indices are shuffled, split into buckets of `batch_size * bucket_size_multiplier`
+    samples, sorted by length within each bucket and cut into batches. The batch
+    order is shuffled again so that lengths do not increase monotonically.
+    Compatible with `torch.utils.data.DataLoader(batch_sampler=...)`.
+    """
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        bucket_size_multiplier: int = 100,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: Optional[int] = None,
+    ):
+        assert batch_size > 0, f"batch_size must be positive, got {batch_size}"
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.batch_size = batch_size
+        self.bucket_size = batch_size * bucket_size_multiplier
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_actions(cls, actions: Sequence[Action], batch_size: int, **kwargs) -> "LengthBucketBatchSampler":
+        return cls([action.num_frames for action in actions], batch_size, **kwargs)
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[List[int]]:
+        indices = self.rng.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = indices[start:start + self.bucket_size]
+            bucket = bucket[np.argsort(self.lengths[bucket], kind="stable")]
+            batches.extend(np.split(bucket, np.arange(self.batch_size, len(bucket), self.batch_size)))
+
+        if self.drop_last:
+            batches = [batch for batch in batches if len(batch) == self.batch_size]
+        if self.shuffle:
+            batches = [batches[i] for i in self.rng.permutation(len(batches))]
+
+        for batch in batches:
+            yield batch.tolist()
+
+
+def _expand_visibility(visibility: np.ndarray, num_joints: int) -> np.ndarray:
+    # Broadcast per-frame visibility [T] to per-joint visibility [T, num_joints]
+    if len(visibility.shape) == 1:
+        return np.broadcast_to(visibility[:, np.newaxis], (len(visibility), num_joints))
+    return visibility
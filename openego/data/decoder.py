@@ -0,0 +1,183 @@
+from .collate import RaggedBatch
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import threading
+import os
+import cv2
+
+
+class DecoderPool:
+    """Bounded pool of open video captures that decodes many clips concurrently.
+
+    Captures are kept open between calls, keyed by video path, so repeated clips
+    from the same videos skip container open and probe. At most `max_open`
+    captures exist at once; idle ones are released least recently used first.
+    Decoding runs on `num_threads` threads, which OpenCV allows to run in
+    parallel since it releases the GIL while decoding.
+    """
+    def __init__(self, max_open: int = 64, num_threads: Optional[int] = None):
+        assert max_open > 0, f"max_open must be positive, got {max_open}"
+        self.max_open = max_open
+        self.num_threads = num_threads or min(8, os.cpu_count() or 1)
+        self._idle: "OrderedDict[str, List[cv2.VideoCapture]]" = OrderedDict()
+        self._num_open = 0
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(self.num_threads)
+
+    @property
+    def num_open(self) -> int:
+        return self._num_open
+
+    def decode_many(
+        self,
+        requests: Sequence[Tuple[Union[str, Path], Optional[slice]]],
+        out: Optional[np.ndarray] = None,
+    ) -> RaggedBatch:
+        """Decode `[(video_path, frame_slice), ...]` into one flat RGB frame buffer.
+
+        Clip `i` is written to `frames[offsets[i]:offsets[i] + lengths[i]]`. If `out`
+        is given, frames are decoded into it instead of a newly allocated array, so
+        the same buffer can be reused across batches. `lengths` holds the number of
+        frames actually decoded, which is smaller than requested if a video ends
+        before its reported frame count; later clips are then moved up so the
+        buffer has no gaps.
+
+        All videos must share a resolution, a ValueError is raised otherwise. When
+        benchmarks with different resolutions are mixed, sample batches per
+        benchmark (or per resolution) before decoding.
+        """
+        if len(requests) == 0:
+            raise ValueError("Cannot decode an empty list of requests.")
+
+        paths = [str(video_path) for video_path, _ in requests]
+        unique_paths = list(dict.fromkeys(paths))
+        infos = dict(zip(unique_paths, self._map(self._probe, unique_paths)))
+        resolutions = { info[1:] for info in infos.values() }
+        if len(resolutions) != 1:
+            raise ValueError(f"All requested videos must share a resolution, got {sorted(resolutions)}")
+        height, width = resolutions.pop()
+
+        frame_ranges = [range(*(frame_slice or slice(None)).indices(infos[path][0]))
+                        for path, (_, frame_slice) in zip(paths, requests)]
+        planned = np.array([len(frame_range) for frame_range in frame_ranges], dtype=np.int64)
+        offsets = np.zeros_like(planned)
+        np.cumsum(planned[:-1], out=offsets[1:])
+
+        shape = (int(planned.sum()), height, width, 3)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.dtype != np.uint8 or out.shape[1:] != shape[1:] or len(out) < shape[0]:
+            raise ValueError(f"Output buffer of shape {out.shape} and dtype {out.dtype} cannot hold {shape} uint8 frames.")
+        frames = out[:shape[0]]
+
+        views = [frames[offset:offset + len(frame_range)] for offset, frame_range in zip(offsets, frame_ranges)]
+        lengths = np.array(self._map(self._decode, paths, frame_ranges, views), dtype=np.int64)
+
+        # Close the gaps left by clips that ended early; each clip only moves towards
+        # the front, so it never overwrites a clip that has not been moved yet
+        compact_offsets = np.zeros_like(lengths)
+        np.cumsum(lengths[:-1], out=compact_offsets[1:])
+        for i in np.flatnonzero(compact_offsets != offsets):
+            frames[compact_offsets[i]:compact_offsets[i] + lengths[i]] = frames[offsets[i]:offsets[i] + lengths[i]]
+        return RaggedBatch(data={"frames": frames[:int(lengths.sum())]}, offsets=compact_offsets, lengths=lengths)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._condition:
+            for captures in self._idle.values():
+                for capture in captures:
+                    capture.release()
+            self._num_open -= sum(len(captures) for captures in self._idle.values())
+            self._idle.clear()
+
+    def __enter__(self) -> "DecoderPool":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _map(self, fn: Callable[..., Any], *iterables: Sequence[Any]) -> List[Any]:
+        # Unlike Executor.map, no task outlives a failure: pending ones are cancelled and
+        # running ones awaited, so nothing writes into the caller's buffer after the raise
+        futures = [self._executor.submit(fn, *args) for args in zip(*iterables)]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+
+    def _acquire(self, video_path: str) -> cv2.VideoCapture:
+        with self._condition:
+            while True:
+                captures = self._idle.get(video_path)
+                if captures:
+                    capture = captures.pop()
+                    if not captures:
+                        del self._idle[video_path]
+                    return capture
+                if self._num_open < self.max_open:
+                    break
+                if self._idle:
+                    # Release the least recently used idle capture to make room
+                    lru_path, lru_captures = next(iter(self._idle.items()))
+                    lru_captures.pop(0).release()
+                    if not lru_captures:
+                        del self._idle[lru_path]
+                    self._num_open -= 1
+                else:
+                    self._condition.wait()
+            self._num_open += 1
+
+        # Open outside the lock, the slot is already reserved
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            capture.release()
+            with self._condition:
+                self._num_open -= 1
+                self._condition.notify()
+            raise ValueError(f"Cannot open video file: {video_path}")
+        return capture
+
+    def _release(self, video_path: str, capture: cv2.VideoCapture):
+        with self._condition:
+            self._idle.setdefault(video_path, []).append(capture)
+            self._idle.move_to_end(video_path)
+            self._condition.notify()
+
+    def _probe(self, video_path: str) -> Tuple[int, int, int]:
+        capture = self._acquire(video_path)
+        try:
+            return (int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)))
+        finally:
+            self._release(video_path, capture)
+
+    def _decode(self, video_path: str, frame_range: range, out: np.ndarray) -> int:
+        if len(frame_range) == 0:
+            return 0
+
+        capture = self._acquire(video_path)
+        try:
+            # Seek once and read forward, skipping frames with grab() for strided slices
+            if frame_range.step < 0 or int(capture.get(cv2.CAP_PROP_POS_FRAMES)) != frame_range.start:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame_range.start)
+            for count in range(len(frame_range)):
+                if count > 0 and frame_range.step < 0:
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, frame_range[count])
+                elif count > 0:
+                    for _ in range(frame_range.step - 1):
+                        capture.grab()
+                success, frame = capture.read()
+                if not success:
+                    return count
+                if frame.shape[:2] != out.shape[1:3]:
+                    raise ValueError(f"Frame of shape {frame.shape} does not match the output buffer in {video_path}")
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out[count])
+            return len(frame_range)
+        finally:
+            self._release(video_path, capture)
@@ -1,9 +1,16 @@
-from ..core.utils import get_sorted_paths, get_video_info, get_video_frames, load_json, get_hdf5_data
+from ..core.utils import get_video_info, get_video_frames, load_json, get_hdf5_data
 from ..core.constants import MANO_JOINT_NAMES, EGODEX_JOINT_NAMES
-from typing import List, Mapping, Optional, Any, Union
+from .annotations import Action, ActionIntervalIndex, ActionLabelTrack
+from typing import List, Mapping, Optional, Any, Union, Sequence, Set, Tuple
 from pathlib import Path
 import numpy as np
-import h5py
+import json
+import os
+
+EGODEX_ANNOTATION_DIR = "annotations"
+INDEX_KEYS = ["data_dir", "fingerprint", "video_names", "video_infos", "probed", "annotation_names", "annotation_ids"]
+VIDEO_INFO_DTYPE = np.dtype([("num_frames", np.int64), ("fps", np.int64), ("width", np.int64),
+                             ("height", np.int64), ("duration", np.float64)])
 
 
 class OpenEgoDataProvider:
@@ -11,16 +18,123 @@ class OpenEgoDataProvider:
         self,
         data_dir: Path,
         data_types: List[str] = ["joint", "rgb", "annotation", "metadata"],
+        index_path: Optional[Path] = None,
+        quarantine_path: Optional[Path] = None,
+        _probe_videos: bool = True,
         # benchmarks: List = [], # Leave empty to include all
     ):  
         self.data_dir = data_dir
         assert data_dir.exists(), f"Data directory does not exist: {data_dir}"
         self.data_types = data_types
-        self.video_paths = [p for p in get_sorted_paths(self.data_dir, "*.mp4") if not p.name.startswith(".")]
-        self.video_name_to_index = { str(path.relative_to(data_dir).parent) : i for i, path in enumerate(self.video_paths) }
+        self.index_path = index_path
+        # Demos listed in the quarantine file (see openego.data.verify) are hidden in memory
+        # and never probed, the saved index always holds every discovered video
+        self.quarantine_path = quarantine_path
+        self.quarantined = load_quarantine(quarantine_path) if quarantine_path is not None else set()
+
+        index = load_index(index_path, data_dir) if index_path is not None and index_path.exists() else None
+        rebuilt = index is None
+        if rebuilt:
+            # A missing or stale index is rebuilt from a fresh discovery
+            fingerprint = get_data_fingerprint(data_dir)
+            video_names, annotation_names = discover_files(self.data_dir)
+            index = {
+                "video_names": video_names,
+                "video_infos": np.zeros(len(video_names), dtype=VIDEO_INFO_DTYPE),
+                "probed": np.zeros(len(video_names), dtype=bool),
+                "annotation_names": annotation_names,
+                "annotation_ids": map_egodex_annotations(video_names, annotation_names),
+                "fingerprint": fingerprint,
+            }
+
+        unprobed = []
+        if _probe_videos:
+            unprobed = [i for i, name in enumerate(index["video_names"]) if not index["probed"][i] and name not in self.quarantined]
+            for i in unprobed:
+                info = get_video_info(data_dir/index["video_names"][i])
+                index["video_infos"][i] = tuple(info[key] for key in VIDEO_INFO_DTYPE.names)
+            index["probed"][unprobed] = True
+        self._set_index(**index)
+        # Whether `index_path` holds exactly the in-memory index, so pickling may ship only its location
+        self._index_saved = index_path is not None and not rebuilt and not unprobed
+        if index_path is not None and _probe_videos and (rebuilt or unprobed):
+            self.save_index(index_path)
+
+    def _set_index(
+        self,
+        video_names: Sequence[str],
+        video_infos: np.ndarray,
+        probed: np.ndarray,
+        annotation_names: Sequence[str],
+        annotation_ids: np.ndarray,
+        fingerprint: str,
+    ):
+        # The full index is kept packed for saving and pickling, quarantined demos are
+        # only dropped from the lists used for loading
+        self._index = {
+            "video_names": pack_names(video_names),
+            "video_infos": video_infos,
+            "probed": probed,
+            "annotation_names": pack_names(annotation_names),
+            "annotation_ids": np.asarray(annotation_ids, dtype=np.int32),
+            "fingerprint": np.array(fingerprint),
+        }
+        # annotation_ids[i] indexes annotation_names for videos whose annotation is not
+        # next to the video (EgoDex), -1 otherwise
+        keep = [i for i, name in enumerate(video_names) if name not in self.quarantined]
+        video_names = [video_names[i] for i in keep]
+        self.video_paths = [self.data_dir/name for name in video_names]
+        self.video_name_to_index = { str(Path(name).parent) : i for i, name in enumerate(video_names) }
         self._video_benchmarks = [get_benchmark_name(video_path) for video_path in self.video_paths]
         self.benchmarks = sorted(list(set(self._video_benchmarks)))
-        self._video_infos = [get_video_info(video_path) for video_path in self.video_paths]
+        self._video_infos = [dict(zip(VIDEO_INFO_DTYPE.names, info)) for info in video_infos[keep].tolist()]
+        self._probed = bool(np.all(probed[keep]))
+        self._annotation_names = list(annotation_names)
+        self._annotation_ids = self._index["annotation_ids"][keep]
+        self._fingerprint = fingerprint
+        self._action_indices = {}
+
+    def _require_video_infos(self):
+        if not self._probed:
+            raise RuntimeError("Video info was not probed for every demo of this provider.")
+
+    def _get_video_info(self, index: int) -> Mapping[str, Any]:
+        self._require_video_infos()
+        return self._video_infos[index]
+
+    def save_index(self, index_path: Path):
+        """Save discovered videos and their info so the provider can be reopened without probing."""
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(index_path, "wb") as f:
+            np.savez(f, data_dir=np.array(str(self.data_dir.resolve())), **self._index)
+        if index_path == self.index_path:
+            self._index_saved = True
+
+    def __getstate__(self) -> Mapping[str, Any]:
+        # Ship a compact index (or just its location) to workers instead of Path lists and dicts.
+        # The resolved quarantine is shipped too so workers see exactly the same demo order.
+        state = { "data_dir": str(self.data_dir), "data_types": self.data_types, "index_path": self.index_path,
+                  "quarantine_path": self.quarantine_path, "quarantined": pack_names(sorted(self.quarantined)),
+                  "fingerprint": self._fingerprint }
+        if not self._index_saved:
+            state["index"] = self._index
+        return state
+
+    def __setstate__(self, state: Mapping[str, Any]):
+        self.data_dir = Path(state["data_dir"])
+        self.data_types = state["data_types"]
+        self.index_path = state["index_path"]
+        self.quarantine_path = state["quarantine_path"]
+        self.quarantined = set(unpack_names(state["quarantined"]))
+        # Compare against the parent's fingerprint only, files written to the data directory
+        # after the provider was built must not invalidate it in workers
+        self._index_saved = "index" not in state
+        index = state["index"] if "index" in state else \
+            load_index(self.index_path, self.data_dir, packed=True, fingerprint=state["fingerprint"])
+        if index is None:
+            raise RuntimeError(f"Index no longer matches the pickled provider, rebuild it: {self.index_path}")
+        self._set_index(unpack_names(index["video_names"]), index["video_infos"], index["probed"],
+                        unpack_names(index["annotation_names"]), index["annotation_ids"], str(index["fingerprint"]))
 
     def __len__(self):
         return len(self.video_paths)
@@ -31,24 +145,25 @@ class OpenEgoDataProvider:
 
     @property
     def num_frames(self) -> int:
+        self._require_video_infos()
         return sum([info['num_frames'] for info in self._video_infos])
 
     @property
     def duration(self) -> float: # In seconds
+        self._require_video_infos()
         return sum([info['duration'] for info in self._video_infos])
 
     def __getitem__(self, index: int, demo_slice: Optional[slice] = None) -> Mapping[str, np.ndarray]:
         video_path = self.video_paths[index]
         benchmark_name = self._video_benchmarks[index]
-        video_info = self._video_infos[index]
 
         data = {}
         if "joint" in self.data_types:
             data['joint'] = self._load_joint(video_path, benchmark_name, demo_slice)
         if "annotation" in self.data_types:
-            data['annotation'] = self._load_annotation(video_path, benchmark_name, demo_slice)
+            data['annotation'] = self._load_annotation(video_path, benchmark_name, demo_slice, self._get_annotation_path(index))
         if "metadata" in self.data_types:
-            data['metadata'] = self._load_metadata(video_path, benchmark_name, video_info)
+            data['metadata'] = self._load_metadata(video_path, benchmark_name, self._get_video_info(index))
             data['metadata']['video_path'] = self.video_paths[index]
             data['metadata']['benchmark'] = self._video_benchmarks[index]
         if "rgb" in self.data_types:
@@ -62,6 +177,63 @@ class OpenEgoDataProvider:
   
         return self.__getitem__(self.video_name_to_index[video_name])
 
+    def get_action_index(self, index: int) -> ActionIntervalIndex:
+        """Frame interval index over the actions of demo `index`, built once and cached."""
+        index = range(len(self))[index]
+        if index not in self._action_indices:
+            self._action_indices[index] = self._build_action_index(index)
+        return self._action_indices[index]
+
+    def get_actions(self, index: int) -> List[Action]:
+        """Actions of demo `index` with the demo's joints and video attached."""
+        video_path = self.video_paths[index]
+        benchmark_name = self._video_benchmarks[index]
+        annotation = self._load_annotation(video_path, benchmark_name, annotation_path=self._get_annotation_path(index))
+        video_info = annotation["video_info"] if "video_info" in annotation else self._get_video_info(index)
+        video_joints = self._load_joint(video_path, benchmark_name)
+        return [Action(**action, fps=video_info["fps"], width=video_info["width"], height=video_info["height"],
+                       video_joints=video_joints, video_path=video_path) for action in annotation["actions"]]
+
+    def build_action_label_track(self, output_dir: Optional[Path] = None) -> ActionLabelTrack:
+        """Dense per-frame action labels for every demo.
+
+        If `output_dir` is given the labels are written straight to disk and the
+        returned track is memory-mapped, see `ActionLabelTrack.load`. EgoDex demos
+        without an annotation file are labelled -1 throughout. Indices are built
+        per demo and not cached, unlike `get_action_index`.
+        """
+        self._require_video_infos()
+        frame_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum([info['num_frames'] for info in self._video_infos], out=frame_offsets[1:])
+
+        if output_dir is None:
+            labels = np.empty(frame_offsets[-1], dtype=np.int32)
+        else:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            labels = np.lib.format.open_memmap(output_dir/ActionLabelTrack.LABELS_FILE, mode="w+",
+                                               dtype=np.int32, shape=(int(frame_offsets[-1]),))
+
+        for index in range(len(self)):
+            num_frames = frame_offsets[index + 1] - frame_offsets[index]
+            if self._video_benchmarks[index] == "egodex" and self._annotation_ids[index] < 0:
+                labels[frame_offsets[index]:frame_offsets[index + 1]] = -1
+            else:
+                labels[frame_offsets[index]:frame_offsets[index + 1]] = self._build_action_index(index).label_track(num_frames)
+
+        if output_dir is None:
+            return ActionLabelTrack(labels, frame_offsets)
+        labels.flush()
+        del labels
+        np.save(output_dir/ActionLabelTrack.OFFSETS_FILE, frame_offsets)
+        return ActionLabelTrack.load(output_dir)
+
+    def _build_action_index(self, index: int) -> ActionIntervalIndex:
+        video_path = self.video_paths[index]
+        annotation = self._load_annotation(video_path, self._video_benchmarks[index],
+                                           annotation_path=self._get_annotation_path(index))
+        fps = (annotation["video_info"] if "video_info" in annotation else self._get_video_info(index))["fps"]
+        return ActionIntervalIndex.from_annotation(annotation, fps)
+
     def _load_rgb(self, video_path: Path, demo_slice: Optional[slice] = None):
         return get_video_frames(video_path, demo_slice)
 
@@ -76,9 +248,16 @@ class OpenEgoDataProvider:
         else:
             raise RuntimeError(f"Unknown benchmark or missing joint data for video: {video_path}")
         
-    def _load_annotation(self, video_path: Path, benchmark_name: str, demo_slice: Optional[slice] = None):
+    def _get_annotation_path(self, index: int) -> Optional[Path]:
+        annotation_id = self._annotation_ids[index]
+        return self.data_dir/self._annotation_names[annotation_id] if annotation_id >= 0 else None
+
+    def _load_annotation(self, video_path: Path, benchmark_name: str, demo_slice: Optional[slice] = None,
+                         annotation_path: Optional[Path] = None):
         if benchmark_name == 'egodex':
-            raise NotImplementedError("Need to implement annotation loading for egodex.")
+            if annotation_path is None:
+                raise FileNotFoundError(f"No EgoDex annotation found for video: {video_path}")
+            return load_json(annotation_path)
         elif benchmark_name in self.benchmarks:
             return load_json(video_path.parent/"annotation.json")
         else: 
@@ -107,7 +286,83 @@ def get_benchmark_name(video_path: Path) -> str:
     else:
         raise ValueError(f"Cannot determine benchmark name from path: {video_path}")
 
+def get_data_fingerprint(data_dir: Path) -> str:
+    """Names and modification times of the benchmark directories, used to detect a stale index.
+
+    Adding or removing demos directly inside a benchmark directory changes its mtime.
+    Changes deeper in the tree (e.g. a new EgoDex task) require deleting the index.
+    """
+    entries = sorted((entry.name, entry.stat().st_mtime_ns) for entry in os.scandir(data_dir) if entry.is_dir())
+    return json.dumps(entries)
+
+def load_index(index_path: Path, data_dir: Path, packed: bool = False,
+               fingerprint: Optional[str] = None) -> Optional[Mapping[str, Any]]:
+    """Load a saved index, or None if it was built for another or a since modified data directory.
+
+    If `fingerprint` is given the index must have been saved with it, instead of
+    matching the current state of `data_dir`.
+    """
+    if fingerprint is None:
+        fingerprint = get_data_fingerprint(data_dir)
+    with np.load(index_path) as index:
+        # Indexes written by older versions lack some arrays (e.g. the EgoDex annotation map)
+        if any(key not in index for key in INDEX_KEYS) or str(index["data_dir"]) != str(data_dir.resolve()) or \
+                str(index["fingerprint"]) != fingerprint:
+            return None
+        data = { key: index[key] for key in ["video_names", "video_infos", "probed", "annotation_names", "annotation_ids"] }
+        data["fingerprint"] = str(index["fingerprint"])
+    if not packed:
+        data.update(video_names=unpack_names(data["video_names"]), annotation_names=unpack_names(data["annotation_names"]))
+    return data
+
+def discover_files(data_dir: Path) -> Tuple[List[str], List[str]]:
+    """Relative paths of all videos and EgoDex annotation files, found in a single directory walk."""
+    from natsort import natsorted
+    video_paths, annotation_paths = [], []
+    # Like Path.rglob, symlinked directories are not followed
+    for root, _, file_names in os.walk(data_dir):
+        relative_root = Path(root).relative_to(data_dir)
+        in_annotations = is_egodex_annotation_dir(relative_root)
+        for file_name in file_names:
+            if file_name.startswith("."):
+                continue
+            if file_name.endswith(".mp4"):
+                video_paths.append(relative_root/file_name)
+            elif in_annotations and file_name.endswith(".json"):
+                annotation_paths.append(relative_root/file_name)
+    return [str(p) for p in natsorted(video_paths)], [str(p) for p in natsorted(annotation_paths)]
+
+def is_egodex_annotation_dir(relative_dir: Path) -> bool:
+    parts = relative_dir.parts
+    return any(parts[i].lower() == "egodex" and parts[i + 1] == EGODEX_ANNOTATION_DIR for i in range(len(parts) - 1))
+
+def get_egodex_annotation_name(video_name: str) -> str:
+    # EgoDex/part<n>/<task>/<demo>.mp4 -> EgoDex/annotations/part<n>/<task>/<demo>.json
+    parts = Path(video_name).parts
+    return str(Path(*parts[:-3], EGODEX_ANNOTATION_DIR, *parts[-3:]).with_suffix(".json"))
+
+def map_egodex_annotations(video_names: Sequence[str], annotation_names: Sequence[str]) -> np.ndarray:
+    """Index into `annotation_names` of every EgoDex video's annotation, -1 if it has none."""
+    annotation_to_id = { name: i for i, name in enumerate(annotation_names) }
+    return np.array([annotation_to_id.get(get_egodex_annotation_name(name), -1)
+                     if get_benchmark_name(Path(name)) == "egodex" else -1 for name in video_names], dtype=np.int32)
+
+def load_quarantine(quarantine_path: Path) -> Set[str]:
+    """Video paths, relative to the data directory, listed one per line."""
+    if not quarantine_path.exists():
+        return set()
+    with open(quarantine_path, "r") as f:
+        return { line.strip() for line in f if line.strip() }
+
+def pack_names(names: Sequence[str]) -> np.ndarray:
+    # Newline-joined UTF-8 bytes are far smaller than a fixed-width unicode array
+    return np.frombuffer("\n".join(names).encode("utf-8"), dtype=np.uint8)
+
+def unpack_names(packed: np.ndarray) -> List[str]:
+    return packed.tobytes().decode("utf-8").split("\n") if len(packed) > 0 else []
+
 def get_egodex_joints(video_path: Path, visibility_confidence_threshold: float = 0.5) -> Mapping[str, np.ndarray]:
+    import h5py
     with h5py.File(video_path.with_suffix(".hdf5"), "r") as f:
         data = {}
         for key in f.keys():
@@ -132,6 +387,7 @@ def get_egodex_joints(video_path: Path, visibility_confidence_threshold: float =
     return hand_dict
 
 def get_egodex_intrinsic(video_path: Path) -> np.ndarray:
+    import h5py
     with h5py.File(video_path.with_suffix(".hdf5"), "r") as f:
         intrinsic = f["camera"]["intrinsic"][()]
     return intrinsic
\ No newline at end of file
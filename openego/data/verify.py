@@ -0,0 +1,202 @@
+"""Parallel integrity verification of an OpenEgo dataset.
+
+Every demo is checked in a process pool: the video must open and decode to its
+last frame, joint arrays and `annotation.json` must agree with the video frame
+count, action timestamps must lie within the video and camera intrinsics must be
+present. Results are appended to a JSON lines report so an interrupted run
+resumes where it stopped, and failing demos are written to a quarantine file that
+`OpenEgoDataProvider(quarantine_path=...)` uses to skip them at load time. A
+worker that dies (e.g. a decoder segfault) does not stall the run: the demos it
+may have been checking are re-checked one process at a time and the one that
+crashes is reported as failed.
+
+Usage:
+    python -m openego.data.verify path/to/data --report report.jsonl --quarantine quarantine.txt
+"""
+from ..core.utils import get_video_info, get_video_frames
+from .openego import OpenEgoDataProvider
+from .annotations import ActionIntervalIndex
+from typing import Callable, List, Mapping, Optional, Any, Sequence, Set
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from pathlib import Path
+import numpy as np
+import argparse
+import json
+import os
+
+_PROVIDER: Optional[OpenEgoDataProvider] = None
+
+
+def verify_demo(provider: OpenEgoDataProvider, index: int) -> Mapping[str, Any]:
+    """Run all consistency checks on demo `index` and return its report entry."""
+    video_path = provider.video_paths[index]
+    benchmark_name = provider._video_benchmarks[index]
+    errors: List[str] = []
+    try:
+        video_info = get_video_info(video_path)
+        num_frames = video_info["num_frames"]
+        if num_frames <= 0:
+            errors.append("video reports no frames")
+        elif len(get_video_frames(video_path, slice(num_frames - 1, num_frames))) != 1:
+            errors.append(f"video cannot decode its last frame ({num_frames - 1})")
+
+        joints = provider._load_joint(video_path, benchmark_name)
+        for key in ["left_hand", "right_hand", "left_hand_visibility", "right_hand_visibility"]:
+            if len(joints[key]) != num_frames:
+                errors.append(f"joints '{key}' has {len(joints[key])} rows, video has {num_frames} frames")
+        intrinsic = joints.get("intrinsics")
+        if intrinsic is None or np.shape(intrinsic)[-2:] != (3, 3) or not np.all(np.isfinite(intrinsic)):
+            errors.append("intrinsics are missing or invalid")
+
+        annotation = provider._load_annotation(video_path, benchmark_name,
+                                               annotation_path=provider._get_annotation_path(index))
+        errors.extend(verify_annotation(annotation, video_info))
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+
+    return { "video": str(video_path.relative_to(provider.data_dir)), "ok": not errors, "errors": errors }
+
+
+def verify_annotation(annotation: Mapping[str, Any], video_info: Mapping[str, Any]) -> List[str]:
+    errors = []
+    annotation_info = annotation.get("video_info", {})
+    if "num_frames" in annotation_info and annotation_info["num_frames"] != video_info["num_frames"]:
+        errors.append(f"annotation video_info has {annotation_info['num_frames']} frames, "
+                      f"video has {video_info['num_frames']}")
+
+    index = ActionIntervalIndex.from_annotation(annotation, annotation_info.get("fps", video_info["fps"]))
+    empty = index.start_frames >= index.end_frames
+    for action_index in np.flatnonzero(empty):
+        errors.append(f"action {action_index} has no frames, it spans [{index.start_frames[action_index]}, "
+                      f"{index.end_frames[action_index]})")
+    outside = ~empty & ((index.start_frames < 0) | (index.end_frames > video_info["num_frames"]))
+    for action_index in np.flatnonzero(outside):
+        errors.append(f"action {action_index} spans frames [{index.start_frames[action_index]}, "
+                      f"{index.end_frames[action_index]}) outside of [0, {video_info['num_frames']})")
+    return errors
+
+
+def _init_worker(provider: OpenEgoDataProvider):
+    global _PROVIDER
+    _PROVIDER = provider
+
+
+def _verify_index(index: int) -> Mapping[str, Any]:
+    return verify_demo(_PROVIDER, index)
+
+
+def _run_pool(
+    provider: OpenEgoDataProvider,
+    indices: Sequence[int],
+    num_workers: int,
+    write: Callable[[Mapping[str, Any]], None],
+) -> List[int]:
+    """Verify `indices` in a process pool, returning the demos in flight whenever a worker died."""
+    pending = deque(indices)
+    crashed: List[int] = []
+    while pending:
+        # Bound the submitted demos so a crash only leaves a few of them undecided
+        with ProcessPoolExecutor(num_workers, initializer=_init_worker, initargs=(provider,)) as executor:
+            in_flight = {}
+            broken = False
+            while (pending or in_flight) and not broken:
+                while pending and len(in_flight) < 2 * num_workers:
+                    index = pending.popleft()
+                    in_flight[executor.submit(_verify_index, index)] = index
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        broken = True
+                        continue
+                    write(future.result())
+                    del in_flight[future]
+            crashed.extend(in_flight.values())
+    return crashed
+
+
+def load_report(report_path: Path) -> List[Mapping[str, Any]]:
+    """Report entries, ignoring a last line left incomplete by a killed run."""
+    if not report_path.exists():
+        return []
+    with open(report_path, "r") as f:
+        lines = [line for line in f if line.strip()]
+    entries = []
+    for i, line in enumerate(lines):
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            if i != len(lines) - 1:
+                raise
+    return entries
+
+
+def _trim_partial_line(report_path: Path):
+    # Drop an incomplete last entry so new entries are not appended to it
+    if not report_path.exists():
+        return
+    with open(report_path, "rb+") as f:
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            f.truncate(content.rfind(b"\n") + 1)
+
+
+def verify_dataset(
+    provider: OpenEgoDataProvider,
+    report_path: Path,
+    quarantine_path: Path,
+    num_workers: Optional[int] = None,
+) -> Mapping[str, int]:
+    """Verify every demo of `provider` in a process pool.
+
+    Demos already present in `report_path` are skipped. Demos whose worker
+    process crashes are reported as failed. The quarantine file is rewritten
+    from the full report once all demos have been checked.
+    """
+    _trim_partial_line(report_path)
+    done: Set[str] = { entry["video"] for entry in load_report(report_path) }
+    pending = [i for i, path in enumerate(provider.video_paths) if str(path.relative_to(provider.data_dir)) not in done]
+
+    num_workers = num_workers or os.cpu_count() or 1
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "a") as report:
+        def write(entry: Mapping[str, Any]):
+            report.write(json.dumps(entry) + "\n")
+            report.flush()
+
+        # Any demo in flight may have killed the pool, re-check each alone to find the culprit
+        for index in _run_pool(provider, pending, num_workers, write):
+            if _run_pool(provider, [index], 1, write):
+                write({ "video": str(provider.video_paths[index].relative_to(provider.data_dir)), "ok": False,
+                        "errors": ["worker process crashed while verifying the demo"] })
+
+    entries = load_report(report_path)
+    quarantined = sorted({ entry["video"] for entry in entries if not entry["ok"] })
+    quarantine_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(quarantine_path, "w") as f:
+        f.writelines(name + "\n" for name in quarantined)
+
+    return { "checked": len(pending), "total": len(entries), "quarantined": len(quarantined) }
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Verify the integrity of an OpenEgo dataset.")
+    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("--report", type=Path, default=Path("verify_report.jsonl"))
+    parser.add_argument("--quarantine", type=Path, default=Path("quarantine.txt"))
+    parser.add_argument("--index-path", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parsed = parser.parse_args(args)
+
+    # Videos are probed inside the workers so that unreadable files are reported, not raised
+    provider = OpenEgoDataProvider(parsed.data_dir, data_types=["joint", "annotation"],
+                                   index_path=parsed.index_path, _probe_videos=False)
+    summary = verify_dataset(provider, parsed.report, parsed.quarantine, num_workers=parsed.workers)
+    print(f"Checked {summary['checked']} demos ({summary['total']} in report), "
+          f"{summary['quarantined']} quarantined: {parsed.quarantine}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,11 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    entry_points={
+        "console_scripts": [
+            "openego-verify=openego.data.verify:main",
+        ],
+    },
     extras_require={
         "dev": [
             "pytest>=6.0",
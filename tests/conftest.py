@@ -0,0 +1,83 @@
+"""Shared fixtures building a small synthetic OpenEgo dataset on disk."""
+
+import json
+import pytest
+import numpy as np
+from pathlib import Path
+
+
+def write_video(video_path: Path, num_frames: int, width: int = 64, height: int = 48, fps: int = 30):
+    import cv2
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for frame_index in range(num_frames):
+        writer.write(np.full((height, width, 3), frame_index % 256, dtype=np.uint8))
+    writer.release()
+
+
+def write_hdf5(file_path: Path, data: dict):
+    import h5py
+    with h5py.File(file_path, "w") as f:
+        for key, value in data.items():
+            f[key] = value
+
+
+def write_demo(demo_dir: Path, num_frames: int, actions: list, fps: int = 30):
+    demo_dir.mkdir(parents=True, exist_ok=True)
+    write_video(demo_dir/"video.mp4", num_frames, fps=fps)
+    write_hdf5(demo_dir/"joints.hdf5", {
+        "left_hand": np.random.rand(num_frames, 21, 3).astype(np.float32),
+        "right_hand": np.random.rand(num_frames, 21, 3).astype(np.float32),
+        "left_hand_visibility": np.ones(num_frames, dtype=np.int64),
+        "right_hand_visibility": np.ones(num_frames, dtype=np.int64),
+        "intrinsics": np.eye(3),
+    })
+    write_hdf5(demo_dir/"metadata.hdf5", {"intrinsics": np.eye(3), "num_frames": num_frames, "fps": fps})
+    write_hdf5(demo_dir/"original_metadata.hdf5", {"source": "synthetic"})
+    annotation = {
+        "task": "synthetic task",
+        "actions": [dict(start_timestamp=start, end_timestamp=end, objects=["cube"], actors=["left_hand"],
+                         label=f"action {i}") for i, (start, end) in enumerate(actions)],
+        "video_info": {"num_frames": num_frames, "duration": num_frames / fps, "fps": fps, "height": 48, "width": 64},
+    }
+    with open(demo_dir/"annotation.json", "w") as f:
+        json.dump(annotation, f)
+
+
+def write_egodex_demo(data_dir: Path, part: str, task: str, demo: str, num_frames: int, actions: list = None, fps: int = 30):
+    from openego.core.constants import EGODEX_JOINT_NAMES
+    task_dir = data_dir/"EgoDex"/part/task
+    task_dir.mkdir(parents=True, exist_ok=True)
+    write_video(task_dir/f"{demo}.mp4", num_frames, fps=fps)
+    write_hdf5(task_dir/f"{demo}.hdf5", {
+        "camera/intrinsic": np.eye(3),
+        **{f"transforms/{key}": np.tile(np.eye(4), (num_frames, 1, 1)) for key in EGODEX_JOINT_NAMES},
+    })
+    if actions is not None:
+        annotation_dir = data_dir/"EgoDex"/"annotations"/part/task
+        annotation_dir.mkdir(parents=True, exist_ok=True)
+        annotation = {
+            "task": task.replace("_", " "),
+            "actions": [dict(start_timestamp=start, end_timestamp=end, objects=["cup"], actors=["right_hand"],
+                             label=f"action {i}") for i, (start, end) in enumerate(actions)],
+        }
+        with open(annotation_dir/f"{demo}.json", "w") as f:
+            json.dump(annotation, f)
+
+
+@pytest.fixture
+def synthetic_data_dir(tmp_path):
+    """Two HO-Cap style demos with short videos and overlapping actions."""
+    data_dir = tmp_path/"openego"
+    write_demo(data_dir/"Synthetic"/"demo_0000", 30, [(0.1, 0.5), (0.4, 0.8)])
+    write_demo(data_dir/"Synthetic"/"demo_0001", 45, [(0.5, 1.0)])
+    return data_dir
+
+
+@pytest.fixture
+def egodex_data_dir(tmp_path):
+    """EgoDex style demos, one of them without an annotation file."""
+    data_dir = tmp_path/"openego"
+    write_egodex_demo(data_dir, "part1", "pour_water", "0", 30, [(0.0, 0.5), (0.5, 1.0)])
+    write_egodex_demo(data_dir, "part1", "pour_water", "1", 20, [(0.2, 0.4)])
+    write_egodex_demo(data_dir, "part2", "stack_cups", "0", 20)
+    return data_dir
@@ -0,0 +1,59 @@
+"""Tests for per-frame action label lookup."""
+
+import pytest
+import numpy as np
+from openego import Action, ActionIntervalIndex, ActionLabelTrack, OpenEgoDataProvider
+
+
+class TestActionIntervalIndex:
+    """Test suite for ActionIntervalIndex and ActionLabelTrack."""
+
+    def test_labels_match_action_frames(self):
+        """Test lookups agree with Action.start_frame and Action.end_frame."""
+        annotation = {"actions": [{"start_timestamp": 1.0, "end_timestamp": 3.6},
+                                  {"start_timestamp": 6.9, "end_timestamp": 9.8}]}
+        index = ActionIntervalIndex.from_annotation(annotation, fps=30)
+        actions = [Action(objects=[], actors=[], label="", fps=30, width=0, height=0, **a) for a in annotation["actions"]]
+
+        track = index.label_track(400)
+        for i, action in enumerate(actions):
+            assert np.all(track[action.start_frame:action.end_frame] == i)
+        assert np.sum(track >= 0) == sum(action.num_frames for action in actions)
+        assert index.labels(np.array([0, 30, 107, 108, 207, 999])).tolist() == [-1, 0, 0, -1, 1, -1]
+
+    def test_overlapping_actions(self):
+        """Test overlapping actions are all reported and the latest start is the label."""
+        index = ActionIntervalIndex([0, 5], [10, 15])
+        frames = np.array([[4, 5], [10, 15]])
+
+        assert index.labels(frames).tolist() == [[0, 1], [1, -1]]
+        assert index.covering(frames).shape == (2, 2, 2)
+        assert index.covering(7).tolist() == [True, True]
+        assert index.covering(12).tolist() == [False, True]
+
+    def test_empty_index(self):
+        """Test a demo without actions labels every frame -1."""
+        index = ActionIntervalIndex.from_annotation({"actions": []}, fps=30)
+        assert len(index) == 0
+        assert np.all(index.label_track(10) == -1)
+        assert index.covering(np.arange(3)).shape == (3, 0)
+
+    def test_provider_label_track(self, synthetic_data_dir, tmp_path):
+        """Test the dataset-wide track matches per-demo indices and memory-maps."""
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, data_types=["annotation"])
+        track = provider.build_action_label_track(tmp_path/"labels")
+
+        assert isinstance(track, ActionLabelTrack)
+        assert isinstance(track.labels, np.memmap)
+        assert len(track) == len(provider)
+        assert track.labels.shape == (provider.num_frames,)
+        for i in range(len(provider)):
+            np.testing.assert_array_equal(track[i], provider.get_action_index(i).label_track(len(track[i])))
+        assert track[0][[2, 3, 12, 13, 24]].tolist() == [-1, 0, 1, 1, -1]
+
+        in_memory = provider.build_action_label_track()
+        np.testing.assert_array_equal(in_memory.labels, track.labels)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
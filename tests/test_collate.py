@@ -0,0 +1,99 @@
+"""Tests for ragged batch collation."""
+
+import pytest
+import numpy as np
+from openego import Action, RaggedBatch, collate_items, collate_actions, LengthBucketBatchSampler
+
+
+def make_video_joints(num_frames: int) -> dict:
+    return {
+        "left_hand": np.random.rand(num_frames, 21, 3).astype(np.float32),
+        "right_hand": np.random.rand(num_frames, 21, 3).astype(np.float32),
+        "left_hand_visibility": np.ones(num_frames, dtype=np.int32),
+        "right_hand_visibility": np.zeros(num_frames, dtype=np.int32),
+        "intrinsics": np.eye(3),
+    }
+
+
+def make_action(start: float, end: float, video_joints: dict) -> Action:
+    return Action(start_timestamp=start, end_timestamp=end, objects=[], actors=["left_hand"],
+                  label="test", fps=30, width=64, height=48, video_joints=video_joints)
+
+
+class TestCollate:
+    """Test suite for ragged collation."""
+
+    def test_collate_actions(self):
+        """Test actions are concatenated with matching offsets and lengths."""
+        video_joints = make_video_joints(300)
+        actions = [make_action(0.0, 1.0, video_joints), make_action(2.0, 2.5, video_joints),
+                   make_action(5.0, 9.0, video_joints)]
+        batch = collate_actions(actions)
+
+        assert isinstance(batch, RaggedBatch)
+        assert len(batch) == 3
+        assert batch.lengths.tolist() == [30, 15, 120]
+        assert batch.offsets.tolist() == [0, 30, 45]
+        assert batch.data["left_hand"].shape == (165, 21, 3)
+        assert batch.data["left_hand_visibility"].shape == (165, 21)
+        assert batch.static["intrinsic"].shape == (3, 3, 3)
+        np.testing.assert_array_equal(batch[1]["right_hand"], actions[1].right_hand_joints)
+        assert batch.segment_ids.tolist() == [0] * 30 + [1] * 15 + [2] * 120
+
+    def test_collate_items(self):
+        """Test provider items with per-frame visibility are expanded per joint."""
+        items = [{"joint": make_video_joints(n), "rgb": np.zeros((n, 4, 4, 3), dtype=np.uint8)} for n in (5, 7)]
+        batch = collate_items(items)
+
+        assert batch.num_frames == 12
+        assert batch.data["frames"].shape == (12, 4, 4, 3)
+        assert batch.data["right_hand_visibility"].shape == (12, 21)
+        np.testing.assert_array_equal(batch[1]["left_hand"], items[1]["joint"]["left_hand"])
+
+    def test_collate_length_mismatch(self):
+        """Test collation rejects samples whose modalities disagree in length."""
+        item = {"joint": make_video_joints(5), "rgb": np.zeros((4, 4, 4, 3), dtype=np.uint8)}
+        with pytest.raises(ValueError, match="Length mismatch"):
+            collate_items([item])
+
+    def test_collate_items_without_frame_data(self):
+        """Test items without joints or frames raise a clear error."""
+        with pytest.raises(ValueError, match="no per-frame arrays"):
+            collate_items([{"annotation": {}}, {"annotation": {}}])
+
+    def test_collate_items_key_mismatch(self):
+        """Test arrays present in only some items are not silently dropped."""
+        items = [{"joint": make_video_joints(5)},
+                 {"joint": make_video_joints(5), "rgb": np.zeros((5, 4, 4, 3), dtype=np.uint8)}]
+        with pytest.raises(ValueError, match="Sample 1 has keys"):
+            collate_items(items)
+
+    def test_length_bucket_sampler(self):
+        """Test every index is sampled once and batches group similar lengths."""
+        lengths = np.random.default_rng(0).integers(1, 1000, size=1000)
+        sampler = LengthBucketBatchSampler(lengths, batch_size=10, bucket_size_multiplier=100, seed=0)
+        batches = list(sampler)
+
+        assert len(batches) == len(sampler) == 100
+        assert sorted(i for batch in batches for i in batch) == list(range(1000))
+        spread = np.mean([np.ptp(lengths[batch]) for batch in batches])
+        assert spread < 50
+
+    def test_length_bucket_sampler_drop_last(self):
+        """Test drop_last removes the incomplete batch."""
+        sampler = LengthBucketBatchSampler(list(range(25)), batch_size=10, drop_last=True, shuffle=False)
+        batches = list(sampler)
+        assert len(batches) == len(sampler) == 2
+        assert all(len(batch) == 10 for batch in batches)
+
+    def test_length_bucket_sampler_from_actions(self):
+        """Test sampler built from action frame counts."""
+        video_joints = make_video_joints(300)
+        actions = [make_action(0.0, 0.1 * (i + 1), video_joints) for i in range(8)]
+        sampler = LengthBucketBatchSampler.from_actions(actions, batch_size=4, shuffle=False)
+        assert sampler.lengths.tolist() == [action.num_frames for action in actions]
+        assert list(sampler) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
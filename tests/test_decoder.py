@@ -0,0 +1,124 @@
+"""Tests for the thread-parallel decoder pool."""
+
+import pytest
+import numpy as np
+from openego import DecoderPool, OpenEgoDataProvider, collate_actions
+from openego.core.utils import get_video_frames
+from .conftest import write_video
+
+
+@pytest.fixture
+def video_paths(tmp_path):
+    """Three short videos whose frames are filled with their frame index."""
+    paths = []
+    for i, num_frames in enumerate([30, 45, 20]):
+        paths.append(tmp_path/f"video_{i}.mp4")
+        write_video(paths[-1], num_frames)
+    return paths
+
+
+class TestDecoderPool:
+    """Test suite for DecoderPool."""
+
+    def test_decode_many(self, video_paths):
+        """Test clips are decoded into one buffer and match get_video_frames."""
+        requests = [(video_paths[0], slice(3, 10)), (video_paths[1], slice(40, None)), (video_paths[0], slice(0, 30, 4)),
+                    (video_paths[2], slice(5, 5)), (video_paths[2], None)]
+        with DecoderPool(max_open=4, num_threads=4) as pool:
+            batch = pool.decode_many(requests)
+
+        assert batch.lengths.tolist() == [7, 5, 8, 0, 20]
+        assert batch.offsets.tolist() == [0, 7, 12, 20, 20]
+        assert batch.data["frames"].shape == (40, 48, 64, 3)
+        for i, (video_path, frame_slice) in enumerate(requests):
+            if batch.lengths[i] == 0:
+                continue
+            np.testing.assert_array_equal(batch[i]["frames"], get_video_frames(video_path, frame_slice))
+
+    def test_preallocated_output(self, video_paths):
+        """Test frames are written into a reused output buffer."""
+        out = np.zeros((64, 48, 64, 3), dtype=np.uint8)
+        with DecoderPool() as pool:
+            batch = pool.decode_many([(video_paths[1], slice(10, 20))], out=out)
+            assert np.shares_memory(batch.data["frames"], out)
+            assert abs(float(out[9].mean()) - 19) < 3
+            with pytest.raises(ValueError, match="cannot hold"):
+                pool.decode_many([(video_paths[1], None)], out=out[:8])
+
+    def test_short_read_is_compacted(self, video_paths, monkeypatch):
+        """Test clips that end early leave no gaps in the frame buffer."""
+        pool = DecoderPool(num_threads=1)
+        decode = pool._decode
+        def short_decode(video_path, frame_range, out):
+            count = decode(video_path, frame_range, out)
+            return count - 2 if video_path == str(video_paths[0]) else count
+        monkeypatch.setattr(pool, "_decode", short_decode)
+
+        requests = [(video_paths[0], slice(0, 6)), (video_paths[1], slice(10, 14))]
+        batch = pool.decode_many(requests)
+        pool.close()
+
+        assert batch.lengths.tolist() == [4, 4]
+        assert batch.offsets.tolist() == [0, 4]
+        assert batch.data["frames"].shape[0] == batch.num_frames == len(batch.segment_ids) == 8
+        np.testing.assert_array_equal(batch[0]["frames"], get_video_frames(video_paths[0], slice(0, 4)))
+        np.testing.assert_array_equal(batch[1]["frames"], get_video_frames(video_paths[1], slice(10, 14)))
+
+    def test_failed_decode_stops_other_clips(self, video_paths, monkeypatch):
+        """Test no clip is still decoding into the buffer once decode_many has raised."""
+        import threading
+        pool = DecoderPool(num_threads=2)
+        decode = pool._decode
+        started = threading.Event()
+        finished = []
+        def failing_decode(video_path, frame_range, out):
+            if video_path == str(video_paths[0]):
+                started.wait(5)
+                raise ValueError("corrupt frame")
+            started.set()
+            count = decode(video_path, frame_range, out)
+            finished.append(video_path)
+            return count
+        monkeypatch.setattr(pool, "_decode", failing_decode)
+
+        requests = [(video_paths[0], None), (video_paths[1], None)] + [(video_paths[2], None)] * 8
+        with pytest.raises(ValueError, match="corrupt frame"):
+            pool.decode_many(requests)
+        num_finished = len(finished)
+        pool.close()
+
+        assert str(video_paths[1]) in finished
+        assert len(finished) == num_finished < len(requests) - 1
+
+    def test_bounded_open_captures(self, video_paths):
+        """Test no more than max_open captures are kept open."""
+        pool = DecoderPool(max_open=2, num_threads=4)
+        for _ in range(3):
+            pool.decode_many([(video_path, slice(0, 5)) for video_path in video_paths * 3])
+            assert pool.num_open <= 2
+        pool.close()
+        assert pool.num_open == 0
+
+    def test_unreadable_video(self, tmp_path):
+        """Test an unreadable video raises and frees its slot."""
+        bad_path = tmp_path/"bad.mp4"
+        bad_path.write_bytes(b"not a video")
+        with DecoderPool(max_open=1) as pool:
+            with pytest.raises(ValueError, match="Cannot open video file"):
+                pool.decode_many([(bad_path, None)])
+            assert pool.num_open == 0
+
+    def test_collate_actions_with_decoder(self, synthetic_data_dir):
+        """Test collate_actions decodes frames through the pool."""
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, data_types=["annotation"])
+        actions = provider.get_actions(0) + provider.get_actions(1)
+        with DecoderPool() as pool:
+            batch = collate_actions(actions, include_frames=True, decoder=pool)
+        expected = collate_actions(actions, include_frames=True)
+
+        assert batch.data["frames"].shape == (sum(action.num_frames for action in actions), 48, 64, 3)
+        np.testing.assert_array_equal(batch.data["frames"], expected.data["frames"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
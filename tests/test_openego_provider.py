@@ -271,5 +271,189 @@ class TestOpenEgoDataProvider:
             _ = provider_with_joints.__getitem__(0, demo_slice=slice(10, 20))
 
 
+class TestOpenEgoDataProviderIndex:
+    """Test suite for provider indexing, pickling and lazy imports."""
+
+    def test_pickle_roundtrip(self, synthetic_data_dir):
+        """Test a pickled provider reopens with the same videos and info."""
+        import pickle
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, data_types=["annotation", "metadata"])
+        restored = pickle.loads(pickle.dumps(provider))
+
+        assert restored.video_paths == provider.video_paths
+        assert restored.video_name_to_index == provider.video_name_to_index
+        assert restored.benchmarks == provider.benchmarks
+        assert restored._video_infos == provider._video_infos
+        assert restored[1]["annotation"] == provider[1]["annotation"]
+
+    def test_index_path(self, synthetic_data_dir, tmp_path, monkeypatch):
+        """Test a saved index reopens without probing videos and pickles to its location."""
+        import pickle
+        import openego.data.openego as openego_module
+        index_path = tmp_path/"index.npz"
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)
+        assert index_path.exists()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Videos should not be probed when reopening from an index.")
+        monkeypatch.setattr(openego_module, "get_video_info", fail)
+        reopened = OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)
+        assert reopened.video_paths == provider.video_paths
+        assert reopened.num_frames == provider.num_frames == 75
+
+        assert "video_names" not in reopened.__getstate__()
+        assert pickle.loads(pickle.dumps(reopened))._video_infos == provider._video_infos
+
+    def test_stale_index_is_rebuilt(self, synthetic_data_dir, tmp_path):
+        """Test an index built for another or a modified data directory is not trusted."""
+        from .conftest import write_demo
+        index_path = tmp_path/"index.npz"
+        OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)
+
+        other_dir = tmp_path/"other"
+        write_demo(other_dir/"Synthetic"/"demo_0000", 10, [])
+        assert OpenEgoDataProvider(data_dir=other_dir, index_path=index_path).num_frames == 10
+
+        OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)
+        write_demo(synthetic_data_dir/"Synthetic"/"demo_0002", 10, [])
+        assert len(OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)) == 3
+
+    def test_pickle_ignores_later_writes_to_data_dir(self, synthetic_data_dir, tmp_path):
+        """Test workers unpickle an index-backed provider after files are added to the data directory."""
+        import pickle
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, data_types=["annotation"], index_path=tmp_path/"index.npz")
+        state = pickle.dumps(provider)
+        (synthetic_data_dir/"Synthetic"/"notes.txt").write_text("written after start")
+
+        assert pickle.loads(state).video_paths == provider.video_paths
+
+    def test_pickle_ships_unsaved_index(self, synthetic_data_dir, tmp_path):
+        """Test an index rebuilt in memory but not saved is shipped instead of the stale file."""
+        import pickle
+        from .conftest import write_demo
+        index_path = tmp_path/"index.npz"
+        OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)
+        write_demo(synthetic_data_dir/"Synthetic"/"demo_0002", 10, [])
+
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path, _probe_videos=False)
+        assert "index" in provider.__getstate__()
+        assert len(pickle.loads(pickle.dumps(provider))) == 3
+
+    def test_quarantine_not_saved_in_index(self, synthetic_data_dir, tmp_path):
+        """Test quarantined demos stay in the saved index and reappear without the quarantine."""
+        index_path, quarantine_path = tmp_path/"index.npz", tmp_path/"quarantine.txt"
+        quarantine_path.write_text("Synthetic/demo_0001/video.mp4\n")
+        quarantined = OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path, quarantine_path=quarantine_path)
+        assert len(quarantined) == 1
+
+        reopened = OpenEgoDataProvider(data_dir=synthetic_data_dir, index_path=index_path)
+        assert len(reopened) == 2
+        assert reopened.num_frames == 75
+
+    def test_pickle_keeps_resolved_quarantine(self, synthetic_data_dir, tmp_path):
+        """Test workers keep the parent's demo order when the quarantine file changes."""
+        import pickle
+        from .conftest import write_demo
+        write_demo(synthetic_data_dir/"Synthetic"/"demo_0002", 10, [])
+        quarantine_path = tmp_path/"quarantine.txt"
+        quarantine_path.write_text("")
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, data_types=["annotation"], quarantine_path=quarantine_path)
+        state = pickle.dumps(provider)
+
+        quarantine_path.write_text("Synthetic/demo_0001/video.mp4\n")
+        assert pickle.loads(state).video_paths == provider.video_paths
+
+    def test_unprobed_provider_raises(self, synthetic_data_dir):
+        """Test video info dependent APIs raise when videos were not probed."""
+        provider = OpenEgoDataProvider(data_dir=synthetic_data_dir, _probe_videos=False)
+        with pytest.raises(RuntimeError, match="not probed"):
+            _ = provider.num_frames
+        with pytest.raises(RuntimeError, match="not probed"):
+            provider.build_action_label_track()
+
+    def test_lazy_imports(self):
+        """Test importing the annotation path does not import cv2 or h5py."""
+        import subprocess
+        import sys
+        code = ("import sys, openego; assert 'numpy' not in sys.modules; "
+                "from openego import Action, OpenEgoDataProvider; "
+                "assert 'cv2' not in sys.modules and 'h5py' not in sys.modules")
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+
+class TestEgoDexAnnotations:
+    """Test suite for EgoDex annotation indexing and loading."""
+
+    def test_annotation_map(self, egodex_data_dir):
+        """Test EgoDex videos are mapped to their annotations during discovery."""
+        provider = OpenEgoDataProvider(data_dir=egodex_data_dir, data_types=["annotation"])
+
+        assert provider.benchmarks == ["egodex"]
+        assert [str(p.relative_to(egodex_data_dir)) for p in provider.video_paths] == [
+            "EgoDex/part1/pour_water/0.mp4", "EgoDex/part1/pour_water/1.mp4", "EgoDex/part2/stack_cups/0.mp4"]
+        assert provider._annotation_ids.tolist() == [0, 1, -1]
+        assert provider[0]["annotation"]["task"] == "pour water"
+        assert len(provider[1]["annotation"]["actions"]) == 1
+        with pytest.raises(FileNotFoundError, match="No EgoDex annotation"):
+            _ = provider[2]
+
+    def test_action_apis(self, egodex_data_dir):
+        """Test EgoDex actions are available to the action-level APIs."""
+        provider = OpenEgoDataProvider(data_dir=egodex_data_dir, data_types=["annotation"])
+
+        actions = provider.get_actions(0)
+        assert [(action.start_frame, action.end_frame) for action in actions] == [(0, 15), (15, 30)]
+        assert actions[0].left_hand_joints.shape == (15, 21, 3)
+        assert provider.get_action_index(1).labels(np.array([5, 6, 12])).tolist() == [-1, 0, -1]
+
+    def test_label_track_without_annotation(self, egodex_data_dir):
+        """Test demos without an annotation are labelled -1 instead of aborting the track."""
+        provider = OpenEgoDataProvider(data_dir=egodex_data_dir, data_types=["annotation"])
+        track = provider.build_action_label_track()
+
+        assert track.frame_offsets.tolist() == [0, 30, 50, 70]
+        assert track[0].tolist() == [0] * 15 + [1] * 15
+        assert np.all(track[2] == -1)
+        assert provider._action_indices == {}
+
+    def test_annotation_map_survives_index_and_pickle(self, egodex_data_dir, tmp_path):
+        """Test the annotation map is saved in the index and shipped when pickling."""
+        import pickle
+        index_path = tmp_path/"index.npz"
+        OpenEgoDataProvider(data_dir=egodex_data_dir, index_path=index_path)
+        reopened = OpenEgoDataProvider(data_dir=egodex_data_dir, data_types=["annotation"], index_path=index_path)
+        restored = pickle.loads(pickle.dumps(OpenEgoDataProvider(data_dir=egodex_data_dir, data_types=["annotation"])))
+
+        for provider in [reopened, restored]:
+            assert provider._annotation_ids.tolist() == [0, 1, -1]
+            assert provider[1]["annotation"]["actions"][0]["label"] == "action 0"
+
+
+    def test_discovery_ignores_symlinks_and_other_annotations(self, egodex_data_dir):
+        """Test symlinked directories are not followed and only EgoDex annotations are indexed."""
+        from openego.data.openego import discover_files
+        (egodex_data_dir/"Alias").symlink_to(egodex_data_dir/"EgoDex", target_is_directory=True)
+        other_annotations = egodex_data_dir/"Other"/"annotations"
+        other_annotations.mkdir(parents=True)
+        (other_annotations/"notes.json").write_text("{}")
+
+        video_names, annotation_names = discover_files(egodex_data_dir)
+        assert len(video_names) == 3
+        assert annotation_names == ["EgoDex/annotations/part1/pour_water/0.json",
+                                    "EgoDex/annotations/part1/pour_water/1.json"]
+
+    def test_old_index_without_annotation_map_is_rebuilt(self, egodex_data_dir, tmp_path):
+        """Test an index lacking the annotation arrays is rebuilt instead of hiding annotations."""
+        index_path = tmp_path/"index.npz"
+        OpenEgoDataProvider(data_dir=egodex_data_dir, index_path=index_path)
+        with np.load(index_path) as index:
+            old_index = { key: index[key] for key in index.files if not key.startswith("annotation") }
+        np.savez(index_path, **old_index)
+
+        provider = OpenEgoDataProvider(data_dir=egodex_data_dir, data_types=["annotation"], index_path=index_path)
+        assert provider[0]["annotation"]["task"] == "pour water"
+        with np.load(index_path) as index:
+            assert "annotation_ids" in index
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
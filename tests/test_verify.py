@@ -0,0 +1,109 @@
+"""Tests for the parallel dataset integrity verifier."""
+
+import os
+import json
+import pytest
+import numpy as np
+from openego import OpenEgoDataProvider
+from openego.data.verify import verify_dataset, load_report, main
+from .conftest import write_demo, write_hdf5
+
+
+class CrashingProvider(OpenEgoDataProvider):
+    """Provider whose worker process dies while loading the joints of demo_0001."""
+    def _load_joint(self, video_path, benchmark_name, demo_slice=None):
+        if video_path.parent.name == "demo_0001":
+            os._exit(1)
+        return super()._load_joint(video_path, benchmark_name, demo_slice)
+
+
+@pytest.fixture
+def corrupt_data_dir(synthetic_data_dir):
+    """Synthetic dataset with one demo broken in each checked way."""
+    benchmark_dir = synthetic_data_dir/"Synthetic"
+    write_demo(benchmark_dir/"demo_0002", 20, [(0.0, 0.5)])
+    write_hdf5(benchmark_dir/"demo_0002"/"joints.hdf5", {
+        "left_hand": np.zeros((15, 21, 3)), "right_hand": np.zeros((20, 21, 3)),
+        "left_hand_visibility": np.ones(20), "right_hand_visibility": np.ones(20), "intrinsics": np.eye(3),
+    })
+    write_demo(benchmark_dir/"demo_0003", 20, [(0.5, 2.0)])
+    write_demo(benchmark_dir/"demo_0004", 20, [])
+    (benchmark_dir/"demo_0004"/"video.mp4").write_bytes(b"not a video")
+    write_demo(benchmark_dir/"demo_0005", 20, [(0.3, 0.3)])
+    return synthetic_data_dir
+
+
+class TestVerify:
+    """Test suite for openego.data.verify."""
+
+    def test_verify_dataset(self, corrupt_data_dir, tmp_path):
+        """Test broken demos are reported and quarantined, and valid ones pass."""
+        provider = OpenEgoDataProvider(corrupt_data_dir, data_types=["joint", "annotation"], _probe_videos=False)
+        report_path, quarantine_path = tmp_path/"report.jsonl", tmp_path/"quarantine.txt"
+        summary = verify_dataset(provider, report_path, quarantine_path, num_workers=2)
+
+        assert summary == { "checked": 6, "total": 6, "quarantined": 4 }
+        entries = { entry["video"]: entry for entry in load_report(report_path) }
+        assert entries["Synthetic/demo_0000/video.mp4"]["ok"]
+        assert any("'left_hand' has 15 rows" in e for e in entries["Synthetic/demo_0002/video.mp4"]["errors"])
+        assert any("action 0 spans frames [15, 60)" in e for e in entries["Synthetic/demo_0003/video.mp4"]["errors"])
+        assert any("Cannot open video" in e for e in entries["Synthetic/demo_0004/video.mp4"]["errors"])
+        assert entries["Synthetic/demo_0005/video.mp4"]["errors"] == ["action 0 has no frames, it spans [9, 9)"]
+        assert quarantine_path.read_text().split() == [
+            "Synthetic/demo_0002/video.mp4", "Synthetic/demo_0003/video.mp4", "Synthetic/demo_0004/video.mp4",
+            "Synthetic/demo_0005/video.mp4"]
+
+        # Quarantined demos are skipped before their videos are probed
+        clean = OpenEgoDataProvider(corrupt_data_dir, quarantine_path=quarantine_path)
+        assert len(clean) == 2
+        assert clean.quarantined == set(quarantine_path.read_text().split())
+
+    def test_verify_resume(self, synthetic_data_dir, tmp_path):
+        """Test demos already in the report are not checked again."""
+        report_path, quarantine_path = tmp_path/"report.jsonl", tmp_path/"quarantine.txt"
+        report_path.write_text(json.dumps({ "video": "Synthetic/demo_0000/video.mp4", "ok": True, "errors": [] }) + "\n")
+
+        main([str(synthetic_data_dir), "--report", str(report_path), "--quarantine", str(quarantine_path),
+              "--workers", "1"])
+        assert len(load_report(report_path)) == 2
+        assert quarantine_path.read_text() == ""
+
+    def test_verify_resume_after_truncated_report(self, synthetic_data_dir, tmp_path):
+        """Test a report cut off mid-line by a killed run is resumed and the partial entry redone."""
+        report_path, quarantine_path = tmp_path/"report.jsonl", tmp_path/"quarantine.txt"
+        entry = json.dumps({ "video": "Synthetic/demo_0000/video.mp4", "ok": True, "errors": [] })
+        report_path.write_text(entry + "\n" + entry.replace("0000", "0001")[:20])
+        assert len(load_report(report_path)) == 1
+
+        main([str(synthetic_data_dir), "--report", str(report_path), "--quarantine", str(quarantine_path),
+              "--workers", "1"])
+        assert sorted(entry["video"] for entry in load_report(report_path)) == [
+            "Synthetic/demo_0000/video.mp4", "Synthetic/demo_0001/video.mp4"]
+        assert len(report_path.read_text().splitlines()) == 2
+
+    def test_verify_worker_crash(self, synthetic_data_dir, tmp_path):
+        """Test a demo that kills its worker is reported as failed instead of hanging the run."""
+        from .conftest import write_demo
+        for i in range(2, 6):
+            write_demo(synthetic_data_dir/"Synthetic"/f"demo_{i:04d}", 10, [])
+        provider = CrashingProvider(synthetic_data_dir, data_types=["joint", "annotation"], _probe_videos=False)
+        report_path, quarantine_path = tmp_path/"report.jsonl", tmp_path/"quarantine.txt"
+        summary = verify_dataset(provider, report_path, quarantine_path, num_workers=2)
+
+        assert summary == { "checked": 6, "total": 6, "quarantined": 1 }
+        entries = { entry["video"]: entry for entry in load_report(report_path) }
+        assert entries["Synthetic/demo_0001/video.mp4"]["errors"] == ["worker process crashed while verifying the demo"]
+        assert quarantine_path.read_text().split() == ["Synthetic/demo_0001/video.mp4"]
+
+    def test_verify_missing_egodex_annotation(self, egodex_data_dir, tmp_path):
+        """Test an EgoDex demo without an annotation is reported instead of passing unchecked."""
+        provider = OpenEgoDataProvider(egodex_data_dir, data_types=["joint", "annotation"], _probe_videos=False)
+        verify_dataset(provider, tmp_path/"report.jsonl", tmp_path/"quarantine.txt", num_workers=1)
+
+        entries = { entry["video"]: entry for entry in load_report(tmp_path/"report.jsonl") }
+        assert entries["EgoDex/part1/pour_water/0.mp4"]["ok"]
+        assert any("No EgoDex annotation" in e for e in entries["EgoDex/part2/stack_cups/0.mp4"]["errors"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])